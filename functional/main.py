@@ -1,215 +1,294 @@
-from typing import Tuple, List, Optional
+import heapq
+from collections import deque
+from functools import lru_cache
+from itertools import count, permutations
+from math import inf as INF
+from typing import Dict, Iterator, Tuple, List, Optional, Sequence
 
-Board = Tuple[
-    Tuple[int, int, int],
-    Tuple[int, int, int], 
-    Tuple[int, int, int]
-]
+Board = Tuple[int, ...]
+GoalIndices = Tuple[int, ...]
+PackedBoard = int
+ScoredBoard = Tuple[PackedBoard, int, int]
+LineTables = Tuple[Dict[int, int], ...]
 
+FOUND = -1
 
-def find_tile_position(target_board: Board, tile: int) -> Tuple[int, int]:
-    def search_rows(row_idx: int) -> Tuple[int, int]:
-        if row_idx >= 3:
-            return (-1, -1)
-        
-        def search_cols(col_idx: int) -> Tuple[int, int]:
-            if col_idx >= 3:
-                return search_rows(row_idx + 1)
-            if target_board[row_idx][col_idx] == tile:
-                return (row_idx, col_idx)
-            return search_cols(col_idx + 1)
-        
-        return search_cols(0)
-    return search_rows(0)
+NEIGHBORS = (
+    (1, 3), (0, 2, 4), (1, 5),
+    (0, 4, 6), (1, 3, 5, 7), (2, 4, 8),
+    (3, 7), (4, 6, 8), (5, 7)
+)
 
+MOVES = tuple(
+    tuple((neighbor_idx, 4 * neighbor_idx, (1 << (4 * zero_idx)) - (1 << (4 * neighbor_idx)))
+          for neighbor_idx in NEIGHBORS[zero_idx])
+    for zero_idx in range(9)
+)
 
-def calculate_tile_distance(board: Board, goal: Board, tile: int) -> int:
-    if tile == 0:
-        return 0
-    
-    curr_row, curr_col = find_tile_position(board, tile)
-    goal_row, goal_col = find_tile_position(goal, tile)
-    
-    if curr_row == -1 or goal_row == -1:
-        return 0
-    
-    return abs(curr_row - goal_row) + abs(curr_col - goal_col)
+DIST = tuple(
+    tuple(abs(i // 3 - j // 3) + abs(i % 3 - j % 3) for j in range(9))
+    for i in range(9)
+)
 
 
-def manhattan_distance(board: Board, goal: Board) -> int:
-    def sum_distances(tile: int) -> int:
-        if tile > 8:
-            return 0
-        return calculate_tile_distance(board, goal, tile) + sum_distances(tile + 1)
-    
-    return sum_distances(1)
+def goal_indices(goal: Board) -> GoalIndices:
+    return tuple(goal.index(tile) for tile in range(9))
 
 
-def find_zero(board: Board) -> Tuple[int, int]:
-    def search_rows(row_idx: int) -> Tuple[int, int]:
-        if row_idx >= 3:
-            return (-1, -1)
-        
-        def search_cols(col_idx: int) -> Tuple[int, int]:
-            if col_idx >= 3:
-                return search_rows(row_idx + 1)
-            if board[row_idx][col_idx] == 0:
-                return (row_idx, col_idx)
-            return search_cols(col_idx + 1)
-        
-        return search_cols(0)
-    
-    return search_rows(0)
+def manhattan_distance(board: Board, goal_idx: GoalIndices) -> int:
+    b0, b1, b2, b3, b4, b5, b6, b7, b8 = board
+    return ((DIST[goal_idx[b0]][0] if b0 else 0) + (DIST[goal_idx[b1]][1] if b1 else 0)
+            + (DIST[goal_idx[b2]][2] if b2 else 0) + (DIST[goal_idx[b3]][3] if b3 else 0)
+            + (DIST[goal_idx[b4]][4] if b4 else 0) + (DIST[goal_idx[b5]][5] if b5 else 0)
+            + (DIST[goal_idx[b6]][6] if b6 else 0) + (DIST[goal_idx[b7]][7] if b7 else 0)
+            + (DIST[goal_idx[b8]][8] if b8 else 0))
 
 
-def swap(board: Board, r1: int, c1: int, r2: int, c2: int) -> Board:
-    def build_row(row_idx: int, original_row: Tuple[int, int, int]) -> Tuple[int, int, int]:
-        def build_cell(col_idx: int) -> Tuple[int, int, int]:
-            if col_idx >= 3:
-                return ()
-            
-            if row_idx == r1 and col_idx == c1:
-                value = board[r2][c2]
-            elif row_idx == r2 and col_idx == c2:
-                value = board[r1][c1]
-            else:
-                value = original_row[col_idx]
-            
-            return (value,) + build_cell(col_idx + 1)
-        
-        return build_cell(0)
+def line_conflict_cost(tiles: Tuple[int, ...], line: int, goal_line: Tuple[int, ...],
+                       goal_offset: Tuple[int, ...]) -> int:
+    offsets = [goal_offset[tile] for tile in tiles if tile and goal_line[tile] == line]
+    longest = [1] * len(offsets)
+    for i in range(len(offsets)):
+        for j in range(i):
+            if offsets[j] < offsets[i]:
+                longest[i] = max(longest[i], longest[j] + 1)
+    return 2 * (len(offsets) - max(longest, default=0))
+
+
+@lru_cache(maxsize=16)
+def conflict_tables(goal_idx: GoalIndices) -> Tuple[LineTables, LineTables]:
+    goal_row = tuple(idx // 3 for idx in goal_idx)
+    goal_col = tuple(idx % 3 for idx in goal_idx)
     
-    def build_board(row_idx: int) -> Board:
-        if row_idx >= len(board):
-            return ()
-        
-        new_row = build_row(row_idx, board[row_idx])
-        return (new_row,) + build_board(row_idx + 1)
+    def build(goal_line: Tuple[int, ...], goal_offset: Tuple[int, ...]) -> LineTables:
+        return tuple(
+            {a | b << 4 | c << 8: line_conflict_cost((a, b, c), line, goal_line, goal_offset)
+             for a, b, c in permutations(range(9), 3)}
+            for line in range(3)
+        )
     
-    return build_board(0)
+    return build(goal_row, goal_col), build(goal_col, goal_row)
 
 
-def next_states(board: Board) -> List[Board]:
-    zero_row, zero_col = find_zero(board)
-    directions = ((-1, 0), (1, 0), (0, -1), (0, 1))
-    
-    def generate_moves(dir_idx: int) -> List[Board]:
-        if dir_idx >= len(directions):
-            return []
-        
-        dr, dc = directions[dir_idx]
-        new_row, new_col = zero_row + dr, zero_col + dc
-        
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_board = swap(board, zero_row, zero_col, new_row, new_col)
-            return [new_board] + generate_moves(dir_idx + 1)
+def row_key(packed: PackedBoard, row: int) -> int:
+    return (packed >> (12 * row)) & 0xFFF
+
+
+def column_key(packed: PackedBoard, col: int) -> int:
+    shift = 4 * col
+    return ((packed >> shift) & 0xF) | ((packed >> (shift + 8)) & 0xF0) | ((packed >> (shift + 16)) & 0xF00)
+
+
+def linear_conflicts(board: Board, goal_idx: GoalIndices) -> int:
+    row_tables, col_tables = conflict_tables(goal_idx)
+    packed = pack(board)
+    return (sum(row_tables[row][row_key(packed, row)] for row in range(3))
+            + sum(col_tables[col][column_key(packed, col)] for col in range(3)))
+
+
+def heuristic(board: Board, goal_idx: GoalIndices) -> int:
+    return manhattan_distance(board, goal_idx) + linear_conflicts(board, goal_idx)
+
+
+def pack(board: Board) -> PackedBoard:
+    return sum(tile << (4 * idx) for idx, tile in enumerate(board))
+
+
+def unpack(packed: PackedBoard) -> Board:
+    return tuple(get_tile(packed, idx) for idx in range(9))
+
+
+def get_tile(packed: PackedBoard, idx: int) -> int:
+    return (packed >> (4 * idx)) & 0xF
+
+
+def next_states(packed: PackedBoard, zero_idx: int, parent_h: int,
+                goal_idx: GoalIndices) -> Tuple[ScoredBoard, ...]:
+    row_tables, col_tables = conflict_tables(goal_idx)
+    zero_row, zero_col = divmod(zero_idx, 3)
+    children = []
+    for neighbor_idx, shift, move_factor in MOVES[zero_idx]:
+        tile = (packed >> shift) & 0xF
+        tile_dist = DIST[goal_idx[tile]]
+        child = packed + tile * move_factor
+        child_h = parent_h - tile_dist[neighbor_idx] + tile_dist[zero_idx]
+        neighbor_row, neighbor_col = divmod(neighbor_idx, 3)
+        if neighbor_row == zero_row:
+            for col in (zero_col, neighbor_col):
+                table = col_tables[col]
+                child_h += table[column_key(child, col)] - table[column_key(packed, col)]
         else:
-            return generate_moves(dir_idx + 1)
-    
-    return generate_moves(0)
+            for row in (zero_row, neighbor_row):
+                table = row_tables[row]
+                child_h += table[row_key(child, row)] - table[row_key(packed, row)]
+        children.append((child, neighbor_idx, child_h))
+    return tuple(children)
 
 
-def insert_move_by_heuristic(move: Board, sorted_moves: List[Board], goal: Board) -> List[Board]:
-    if not sorted_moves:
-        return [move]
-    
-    move_distance = manhattan_distance(move, goal)
-    first_distance = manhattan_distance(sorted_moves[0], goal)
-    
-    if move_distance <= first_distance:
-        return [move] + sorted_moves
-    else:
-        return [sorted_moves[0]] + insert_move_by_heuristic(move, sorted_moves[1:], goal)
+def count_inversions(board: Board) -> int:
+    tiles = [tile for tile in board if tile]
+    return sum(1 for i in range(len(tiles)) for j in range(i + 1, len(tiles)) if tiles[i] > tiles[j])
 
 
-def sort_moves_by_heuristic(moves: List[Board], goal: Board) -> List[Board]:
-    def sort_moves(unsorted: List[Board], sorted_result: List[Board]) -> List[Board]:
-        if not unsorted:
-            return sorted_result
-        
-        return sort_moves(
-            unsorted[1:],
-            insert_move_by_heuristic(unsorted[0], sorted_result, goal)
-        )
-    
-    return sort_moves(moves, [])
+def is_solvable(board: Board, goal: Board) -> bool:
+    return count_inversions(board) % 2 == count_inversions(goal) % 2
 
 
-def is_move_promising(move: Board, goal: Board, current_distance: int) -> bool:
-    next_distance = manhattan_distance(move, goal)
-    return next_distance <= current_distance + 2
+def sort_moves_by_heuristic(moves: Sequence[ScoredBoard]) -> Tuple[ScoredBoard, ...]:
+    return tuple(sorted(moves, key=lambda move: move[2]))
 
 
-def solve(board: Board, goal: Board, path: List[Board] = None, max_depth: int = 40) -> Optional[List[Board]]:
-    if path is None:
-        path = [board]
-   
-    if len(path) > max_depth:
+@lru_cache(maxsize=100_000)
+def ordered_next_states(packed: PackedBoard, zero_idx: int, parent_h: int,
+                        goal_idx: GoalIndices) -> Tuple[ScoredBoard, ...]:
+    return sort_moves_by_heuristic(next_states(packed, zero_idx, parent_h, goal_idx))
+
+
+def solve(board: Board, goal: Board) -> Optional[List[Board]]:
+    if not is_solvable(board, goal):
         return None
     
-    if board == goal:
-        return path
+    goal_idx = goal_indices(goal)
+    start = pack(board)
+    target = pack(goal)
+    if start == target:
+        return [board]
     
-    current_distance = manhattan_distance(board, goal)
+    start_zero = board.index(0)
+    start_h = heuristic(board, goal_idx)
+    solution: List[PackedBoard] = []
     
-    if board in path[:-1]:
-        return None
+    def expand(packed: PackedBoard, zero_idx: int, h: int) -> Iterator[ScoredBoard]:
+        return iter(ordered_next_states(packed, zero_idx, h, goal_idx))
+    
+    def search(threshold: int) -> float:
+        next_threshold = INF
+        stack = [(start, 0, expand(start, start_zero, start_h))]
+        path_set = {start}
+        
+        while stack:
+            _, g, children = stack[-1]
+            for next_board, next_zero, next_h in children:
+                if next_board in path_set:
+                    continue
+                
+                f = g + 1 + next_h
+                if f > threshold:
+                    next_threshold = min(next_threshold, f)
+                    continue
+                
+                if next_board == target:
+                    solution.extend(frame[0] for frame in stack)
+                    solution.append(next_board)
+                    return FOUND
+                path_set.add(next_board)
+                stack.append((next_board, g + 1, expand(next_board, next_zero, next_h)))
+                break
+            else:
+                path_set.discard(stack.pop()[0])
+        
+        return next_threshold
     
-    if len(path) > 25 and current_distance > len(path) * 1.3:
+    threshold = start_h
+    while True:
+        result = search(threshold)
+        if result == FOUND:
+            return [unpack(packed) for packed in solution]
+        if result == INF:
+            return None
+        threshold = result
+
+
+def reconstruct_path(parent: Dict[PackedBoard, Optional[PackedBoard]],
+                     packed: PackedBoard) -> List[Board]:
+    path = []
+    while packed is not None:
+        path.append(unpack(packed))
+        packed = parent[packed]
+    path.reverse()
+    return path
+
+
+def a_star_solve(board: Board, goal: Board) -> Optional[List[Board]]:
+    if not is_solvable(board, goal):
         return None
     
-    possible_moves = next_states(board)
-    sorted_moves = sort_moves_by_heuristic(possible_moves, goal)
+    goal_idx = goal_indices(goal)
+    start = pack(board)
+    target = pack(goal)
+    start_h = heuristic(board, goal_idx)
+    tie_breaker = count()
     
-    def try_moves(moves: List[Board]) -> Optional[List[Board]]:
-        if not moves:
-            return None
+    open_heap = [(start_h, 0, next(tie_breaker), start, board.index(0), start_h)]
+    parent: Dict[PackedBoard, Optional[PackedBoard]] = {start: None}
+    best_g = {start: 0}
+    
+    while open_heap:
+        _, g, _, current, zero_idx, h = heapq.heappop(open_heap)
+        if g > best_g[current]:
+            continue
         
-        next_board = moves[0]
-        if next_board not in path and is_move_promising(next_board, goal, current_distance):
-            result = solve(next_board, goal, path + [next_board], max_depth)
-            if result:
-                return result
+        if current == target:
+            return reconstruct_path(parent, current)
         
-        return try_moves(moves[1:])
+        next_g = g + 1
+        for next_board, next_zero, next_h in next_states(current, zero_idx, h, goal_idx):
+            if next_g < best_g.get(next_board, INF):
+                best_g[next_board] = next_g
+                parent[next_board] = current
+                heapq.heappush(open_heap, (next_g + next_h, next_g, next(tie_breaker),
+                                           next_board, next_zero, next_h))
     
-    return try_moves(sorted_moves)
+    return None
 
 
-def board_to_string(board: Board) -> str:
-    def format_row(row: Tuple[int, int, int]) -> str:
-        def format_tiles(col_idx: int) -> str:
-            if col_idx >= 3:
-                return ""
-            tile = row[col_idx]
-            tile_str = "   " if tile == 0 else f" {tile} "
-            return tile_str + format_tiles(col_idx + 1)
+def bfs_solve(board: Board, goal: Board) -> Optional[List[Board]]:
+    if not is_solvable(board, goal):
+        return None
+    
+    start = pack(board)
+    target = pack(goal)
+    parent: Dict[PackedBoard, Optional[PackedBoard]] = {start: None}
+    queue = deque([(start, board.index(0))])
+    
+    while queue:
+        current, zero_idx = queue.popleft()
+        if current == target:
+            return reconstruct_path(parent, current)
         
-        return "│" + format_tiles(0) + "│\n"
+        for neighbor_idx, shift, move_factor in MOVES[zero_idx]:
+            next_board = current + ((current >> shift) & 0xF) * move_factor
+            if next_board not in parent:
+                parent[next_board] = current
+                queue.append((next_board, neighbor_idx))
     
-    def format_rows(row_idx: int) -> str:
-        if row_idx >= 3:
-            return ""
-        return format_row(board[row_idx]) + format_rows(row_idx + 1)
+    return None
+
+
+def board_to_string(board: Board) -> str:
+    def format_row(row: Board) -> str:
+        return "│" + "".join("   " if tile == 0 else f" {tile} " for tile in row) + "│\n"
     
-    return "┌─────────┐\n" + format_rows(0) + "└─────────┘\n"
+    rows = "".join(format_row(board[row_idx * 3:row_idx * 3 + 3]) for row_idx in range(3))
+    return "┌─────────┐\n" + rows + "└─────────┘\n"
 
 def format_solution_steps(solution: List[Board], step_idx: int = 0) -> str:
-    if step_idx >= len(solution):
-        return ""
-    return f"Step {step_idx}:\n" + board_to_string(solution[step_idx]) + format_solution_steps(solution, step_idx + 1)
+    return "".join(
+        f"Step {idx}:\n" + board_to_string(solution[idx])
+        for idx in range(step_idx, len(solution))
+    )
 
 def main():
     initial_board: Board = (
-        (8, 6, 7),
-        (2, 5, 4),
-        (3, 0, 1)
+        8, 6, 7,
+        2, 5, 4,
+        3, 0, 1
     )
     
     goal_board: Board = (
-        (1, 2, 3),  
-        (4, 5, 6),  
-        (7, 8, 0)   
+        1, 2, 3,
+        4, 5, 6,
+        7, 8, 0
     )
     
     print("\nFunctional 8-Puzzle Solver:")
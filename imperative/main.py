@@ -1,155 +1,439 @@
-from typing import List, Optional
-import heapq 
+from functools import cache
+from typing import Dict, List, Optional, Sequence, Tuple
+import heapq
 
 Board = List[List[int]]
+State = int
+LineTables = List[Dict[int, int]]
 
-def copy_board(board: Board) -> Board:
-    new_board: Board = []
-    for row in board:
-        new_board.append(row[:])
-    return new_board
+FOUND = -1
+INF = float("inf")
 
-def board_to_string(board: Board) -> str:
-    result = ""
-    for row in board:
-        for value in row:
-            result = result + f"{value}"
-    return result
+SHIFT = [0, 4, 8, 12, 16, 20, 24, 28, 32]
+MASK = [0xF << shift for shift in SHIFT]
 
-def manhattan_distance(board: Board, goal: Board) -> int:
-   
-    distance = 0
-    
-    goal_pos = {}
-    for row in range(3):
-        for col in range(3):
-            goal_pos[goal[row][col]] = (row, col)
-    
+NEIGHBORS = (
+    (1, 3), (0, 2, 4), (1, 5),
+    (0, 4, 6), (1, 3, 5, 7), (2, 4, 8),
+    (3, 7), (4, 6, 8), (5, 7)
+)
 
-    for row in range(3):
-        for col in range(3):
-            tile = board[row][col]
-            if tile != 0:
-                goal_row, goal_col = goal_pos[tile]
-                distance += abs(row - goal_row) + abs(col - goal_col)
-    
-    return distance
+def build_moves() -> List[List[Tuple[int, int, int]]]:
+    moves = []
+    for zero_idx in range(9):
+        zero_moves = []
+        for new_zero in NEIGHBORS[zero_idx]:
+            move_factor = (1 << SHIFT[zero_idx]) - (1 << SHIFT[new_zero])
+            zero_moves.append((new_zero, SHIFT[new_zero], move_factor))
+        moves.append(zero_moves)
+    return moves
+
+MOVES = build_moves()
+
+def pack_board(board: Board) -> State:
+    top, middle, bottom = board
+    return (top[0] | (top[1] << 4) | (top[2] << 8)
+            | (middle[0] << 12) | (middle[1] << 16) | (middle[2] << 20)
+            | (bottom[0] << 24) | (bottom[1] << 28) | (bottom[2] << 32))
+
+def unpack_board(state: State) -> Board:
+    return [
+        [state & 0xF, (state >> 4) & 0xF, (state >> 8) & 0xF],
+        [(state >> 12) & 0xF, (state >> 16) & 0xF, (state >> 20) & 0xF],
+        [(state >> 24) & 0xF, (state >> 28) & 0xF, (state >> 32) & 0xF],
+    ]
+
+def find_zero(state: State) -> int:
+    for i in range(9):
+        if state & MASK[i] == 0:
+            return i
+    return -1
+
+def count_inversions(state: State) -> int:
+    tiles = []
+    for i in range(9):
+        tile = (state >> SHIFT[i]) & 0xF
+        if tile != 0:
+            tiles.append(tile)
+
+    inversions = 0
+    for i in range(len(tiles)):
+        for j in range(i + 1, len(tiles)):
+            if tiles[i] > tiles[j]:
+                inversions += 1
+    return inversions
+
+def is_solvable(start: State, goal: State) -> bool:
+    return count_inversions(start) % 2 == count_inversions(goal) % 2
+
+def reconstruct_path(parent: Dict[State, Optional[State]], state: State) -> List[State]:
+    path = []
+    current = state
+    while current is not None:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    return path
+
+def states_to_boards(states: Sequence[State]) -> List[Board]:
+    boards = []
+    for state in states:
+        boards.append(unpack_board(state))
+    return boards
+
+def goal_lines(goal: State) -> Tuple[List[int], List[int]]:
+    goal_row = [0] * 9
+    goal_col = [0] * 9
+    for i in range(9):
+        tile = (goal >> SHIFT[i]) & 0xF
+        goal_row[tile] = i // 3
+        goal_col[tile] = i % 3
+    return goal_row, goal_col
+
+def build_distance_table(goal: State) -> List[List[int]]:
+    goal_row, goal_col = goal_lines(goal)
+
+    dist = [[0] * 9]
+    for tile in range(1, 9):
+        row_dist = []
+        for pos in range(9):
+            row_dist.append(abs(pos // 3 - goal_row[tile]) + abs(pos % 3 - goal_col[tile]))
+        dist.append(row_dist)
+    return dist
 
-def get_neighbors(board: Board, zero_row: int, zero_col: int) -> List:
+def manhattan_distance(state: State, dist: List[List[int]]) -> int:
+    return (dist[state & 0xF][0]
+            + dist[(state >> 4) & 0xF][1]
+            + dist[(state >> 8) & 0xF][2]
+            + dist[(state >> 12) & 0xF][3]
+            + dist[(state >> 16) & 0xF][4]
+            + dist[(state >> 20) & 0xF][5]
+            + dist[(state >> 24) & 0xF][6]
+            + dist[(state >> 28) & 0xF][7]
+            + dist[(state >> 32) & 0xF][8])
+
+def line_conflict_cost(tiles: List[int], line: int, goal_line: List[int], goal_offset: List[int]) -> int:
+    offsets = []
+    for tile in tiles:
+        if tile != 0 and goal_line[tile] == line:
+            offsets.append(goal_offset[tile])
+
+    longest_run = 0
+    longest = [1] * len(offsets)
+    for i in range(len(offsets)):
+        for j in range(i):
+            if offsets[j] < offsets[i] and longest[j] + 1 > longest[i]:
+                longest[i] = longest[j] + 1
+        if longest[i] > longest_run:
+            longest_run = longest[i]
+
+    return 2 * (len(offsets) - longest_run)
+
+def build_conflict_tables(goal: State) -> Tuple[LineTables, LineTables]:
+    goal_row, goal_col = goal_lines(goal)
+
+    row_tables = [{}, {}, {}]
+    col_tables = [{}, {}, {}]
+    for a in range(9):
+        for b in range(9):
+            for c in range(9):
+                if a == b or a == c or b == c:
+                    continue
+                key = a | (b << 4) | (c << 8)
+                for line in range(3):
+                    row_tables[line][key] = line_conflict_cost([a, b, c], line, goal_row, goal_col)
+                    col_tables[line][key] = line_conflict_cost([a, b, c], line, goal_col, goal_row)
+
+    return row_tables, col_tables
+
+def row_key(state: State, row: int) -> int:
+    return (state >> SHIFT[row * 3]) & 0xFFF
+
+def column_key(state: State, col: int) -> int:
+    return (((state >> SHIFT[col]) & 0xF)
+            | ((state >> (SHIFT[col] + 8)) & 0xF0)
+            | ((state >> (SHIFT[col] + 16)) & 0xF00))
+
+def linear_conflicts(state: State, conflict_tables: Tuple[LineTables, LineTables]) -> int:
+    row_tables, col_tables = conflict_tables
+    conflicts = 0
+    for line in range(3):
+        conflicts += row_tables[line][row_key(state, line)]
+        conflicts += col_tables[line][column_key(state, line)]
+    return conflicts
+
+def update_heuristic(h: int, state: State, zero_idx: int, neighbor: State, new_zero: int,
+                     dist: List[List[int]], conflict_tables: Tuple[LineTables, LineTables]) -> int:
+    row_tables, col_tables = conflict_tables
+    moved_tile = (state >> SHIFT[new_zero]) & 0xF
+    h += dist[moved_tile][zero_idx] - dist[moved_tile][new_zero]
+    if zero_idx // 3 == new_zero // 3:
+        for col in (zero_idx % 3, new_zero % 3):
+            h += col_tables[col][column_key(neighbor, col)] - col_tables[col][column_key(state, col)]
+    else:
+        for row in (zero_idx // 3, new_zero // 3):
+            h += row_tables[row][row_key(neighbor, row)] - row_tables[row][row_key(state, row)]
+    return h
+
+def get_neighbors(state: State, zero_idx: int) -> List[Tuple[State, int]]:
     neighbors = []
-    zero_positions = []
-    
-    directions = [[-1, 0], [1, 0], [0, -1], [0, 1]]
-    
-    for dr, dc in directions:
-        new_row = zero_row + dr
-        new_col = zero_col + dc
-        
-        if 0 <= new_row < 3 and 0 <= new_col < 3:
-            new_board = copy_board(board)
-            new_board[zero_row][zero_col], new_board[new_row][new_col] = \
-                new_board[new_row][new_col], new_board[zero_row][zero_col]
-            zero_pos = []
-            zero_pos.extend([new_row, new_col])
-            neighbors.append(new_board), zero_positions.append(zero_pos)
-    
-    result = []
-    result.extend([neighbors, zero_positions])
-    return result
-
-def a_star_search(start: Board, goal: Board, max_iterations: int = 100000) -> Optional[List[Board]]:
-    start_hash = board_to_string(start)
-    goal_hash = board_to_string(goal)
-
-    zero_row = 0
-    zero_col = 0
-    for row in range(len(start)):
-        for col in range(len(start[row])):
-            if start[row][col] == 0:
-                zero_row = row
-                zero_col = col
-
-    open_set_item = []
-    open_set_item.extend([manhattan_distance(start, goal), 0, start, [start], zero_row, zero_col])
-    
-    open_set = []
-    heapq.heappush(open_set, (manhattan_distance(start, goal), 0, start_hash, open_set_item))
+    for new_zero, shift, move_factor in MOVES[zero_idx]:
+        tile = (state >> shift) & 0xF
+        neighbors.append((state + tile * move_factor, new_zero))
+    return neighbors
+
+@cache
+def build_pattern_database(goal: State) -> Dict[State, int]:
+    distances = {goal: 0}
+    frontier = [(goal, find_zero(goal))]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier = []
+        for state, zero_idx in frontier:
+            for neighbor, new_zero in get_neighbors(state, zero_idx):
+                if neighbor not in distances:
+                    distances[neighbor] = depth
+                    next_frontier.append((neighbor, new_zero))
+        frontier = next_frontier
+    return distances
+
+def a_star_search(start: Board, goal: Board, max_iterations: int = 100000,
+                  use_pattern_database: bool = False) -> Optional[List[Board]]:
+    states = a_star_states(pack_board(start), pack_board(goal), max_iterations, use_pattern_database)
+    if states is None:
+        return None
+    return states_to_boards(states)
+
+@cache
+def a_star_states(start_state: State, goal_state: State, max_iterations: int,
+                  use_pattern_database: bool = False) -> Optional[Tuple[State, ...]]:
+    if not is_solvable(start_state, goal_state):
+        return None
+
+    dist = build_distance_table(goal_state)
+    conflict_tables = build_conflict_tables(goal_state)
+    pattern_database = build_pattern_database(goal_state) if use_pattern_database else None
+    if pattern_database is not None:
+        start_h = pattern_database[start_state]
+    else:
+        start_h = manhattan_distance(start_state, dist) + linear_conflicts(start_state, conflict_tables)
+
+    buckets: List[List[Tuple[int, State, int]]] = [[] for _ in range(start_h + 1)]
+    buckets[start_h].append((0, start_state, find_zero(start_state)))
+    f_score = start_h
+    open_count = 1
     
-    closed_set = []
-    g_score = {start_hash: 0}
-    counter = 1
+    g_score = {start_state: 0}
+    parent: Dict[State, Optional[State]] = {start_state: None}
     iterations = 0
 
-    while open_set and iterations < max_iterations:
+    while open_count and iterations < max_iterations:
+        while not buckets[f_score]:
+            f_score += 1
+        current_g, current_state, current_zero = buckets[f_score].pop()
+        open_count -= 1
+        
+        if current_g > g_score[current_state]:
+            continue
+        
         iterations += 1
+        current_h = f_score - current_g
 
-        f_score, _, current_hash, current_item = heapq.heappop(open_set)
-        current_board = current_item[2]
-        path = current_item[3]
-        current_zero_row = current_item[4]
-        current_zero_col = current_item[5]
-        
-        current_hash = board_to_string(current_board)
+        if current_state == goal_state:
+            return tuple(reconstruct_path(parent, current_state))
+
+        for neighbor, neighbor_zero in get_neighbors(current_state, current_zero):
+            tentative_g = current_g + 1
 
-        if current_hash == goal_hash:
-            return path
+            if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                g_score[neighbor] = tentative_g
+                parent[neighbor] = current_state
+                if pattern_database is not None:
+                    h_score = pattern_database[neighbor]
+                else:
+                    h_score = update_heuristic(current_h, current_state, current_zero, neighbor, neighbor_zero,
+                                               dist, conflict_tables)
+                f = tentative_g + h_score
+                
+                while f >= len(buckets):
+                    buckets.append([])
+                buckets[f].append((tentative_g, neighbor, neighbor_zero))
+                open_count += 1
+                if f < f_score:
+                    f_score = f
 
-        closed_set.append(current_hash)
-        current_g = g_score[current_hash]
+    return None
 
-        result = get_neighbors(current_board, current_zero_row, current_zero_col)
-        neighbors = result[0]
-        zero_positions = result[1]
-        
-        for i in range(len(neighbors)):
-            neighbor = neighbors[i]
-            neighbor_zero_row = zero_positions[i][0]
-            neighbor_zero_col = zero_positions[i][1]
-            neighbor_hash = board_to_string(neighbor)
-
-            found = False
-            for item in closed_set:
-                if item == neighbor_hash:
-                    found = True
-                    break
-            
-            if found:
+def ida_star_search(start: Board, goal: Board) -> Optional[List[Board]]:
+    start_state = pack_board(start)
+    goal_state = pack_board(goal)
+    if not is_solvable(start_state, goal_state):
+        return None
+
+    dist = build_distance_table(goal_state)
+    conflict_tables = build_conflict_tables(goal_state)
+    path = [start_state]
+
+    def dfs(state: State, zero_idx: int, g: int, h: int, previous_zero: int, threshold: float) -> float:
+        f = g + h
+        if f > threshold:
+            return f
+        if state == goal_state:
+            return FOUND
+
+        minimum = INF
+        for neighbor, new_zero in get_neighbors(state, zero_idx):
+            if new_zero == previous_zero:
                 continue
 
-            tentative_g = current_g + 1
+            neighbor_h = update_heuristic(h, state, zero_idx, neighbor, new_zero, dist, conflict_tables)
+            path.append(neighbor)
+            result = dfs(neighbor, new_zero, g + 1, neighbor_h, zero_idx, threshold)
+            if result == FOUND:
+                return FOUND
+            path.pop()
+            if result < minimum:
+                minimum = result
+        return minimum
 
-            if neighbor_hash not in g_score or tentative_g < g_score[neighbor_hash]:
-                g_score[neighbor_hash] = tentative_g
-                h_score = manhattan_distance(neighbor, goal)
-                f = tentative_g + h_score
+    start_zero = find_zero(start_state)
+    start_h = manhattan_distance(start_state, dist) + linear_conflicts(start_state, conflict_tables)
+    threshold = start_h
+    while threshold != INF:
+        threshold = dfs(start_state, start_zero, 0, start_h, -1, threshold)
+        if threshold == FOUND:
+            return states_to_boards(path)
 
-                path_copy = []
-                for board in path:
-                    path_copy.append(copy_board(board))
-                path_copy.append(copy_board(neighbor))
+    return None
 
-                new_item = []
-                new_item.extend([f, counter, copy_board(neighbor), path_copy, neighbor_zero_row, neighbor_zero_col])
-                
-                heapq.heappush(open_set, (f, counter, neighbor_hash, new_item))
-                counter += 1
+def bidirectional_search(start: Board, goal: Board) -> Optional[List[Board]]:
+    start_state = pack_board(start)
+    goal_state = pack_board(goal)
+    if not is_solvable(start_state, goal_state):
+        return None
+    if start_state == goal_state:
+        return states_to_boards([start_state])
+
+    forward_parent: Dict[State, Optional[State]] = {start_state: None}
+    backward_parent: Dict[State, Optional[State]] = {goal_state: None}
+    forward_g = {start_state: 0}
+    backward_g = {goal_state: 0}
+    forward_frontier = [(start_state, find_zero(start_state))]
+    backward_frontier = [(goal_state, find_zero(goal_state))]
+
+    while forward_frontier and backward_frontier:
+        expand_forward = len(forward_frontier) <= len(backward_frontier)
+        if expand_forward:
+            frontier, parent, g_score, other_g = forward_frontier, forward_parent, forward_g, backward_g
+        else:
+            frontier, parent, g_score, other_g = backward_frontier, backward_parent, backward_g, forward_g
+
+        next_frontier = []
+        meeting = None
+        best_length = 0
+        for state, zero_idx in frontier:
+            for neighbor, neighbor_zero in get_neighbors(state, zero_idx):
+                if neighbor in parent:
+                    continue
+                parent[neighbor] = state
+                g_score[neighbor] = g_score[state] + 1
+                next_frontier.append((neighbor, neighbor_zero))
+                if neighbor in other_g:
+                    length = g_score[neighbor] + other_g[neighbor]
+                    if meeting is None or length < best_length:
+                        meeting = neighbor
+                        best_length = length
+
+        if meeting is not None:
+            path = reconstruct_path(forward_parent, meeting)
+            current = backward_parent[meeting]
+            while current is not None:
+                path.append(current)
+                current = backward_parent[current]
+            return states_to_boards(path)
+
+        if expand_forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
 
     return None
 
+def bidirectional_a_star_search(start: Board, goal: Board) -> Optional[List[Board]]:
+    start_state = pack_board(start)
+    goal_state = pack_board(goal)
+    if not is_solvable(start_state, goal_state):
+        return None
+    if start_state == goal_state:
+        return states_to_boards([start_state])
+
+    forward_dist = build_distance_table(goal_state)
+    forward_tables = build_conflict_tables(goal_state)
+    backward_dist = build_distance_table(start_state)
+    backward_tables = build_conflict_tables(start_state)
+    forward_h = manhattan_distance(start_state, forward_dist) + linear_conflicts(start_state, forward_tables)
+    backward_h = manhattan_distance(goal_state, backward_dist) + linear_conflicts(goal_state, backward_tables)
+
+    forward_open = [(forward_h, 0, start_state, find_zero(start_state))]
+    backward_open = [(backward_h, 0, goal_state, find_zero(goal_state))]
+    forward_parent: Dict[State, Optional[State]] = {start_state: None}
+    backward_parent: Dict[State, Optional[State]] = {goal_state: None}
+    forward_g = {start_state: 0}
+    backward_g = {goal_state: 0}
+
+    meeting = None
+    best_length = INF
+    while True:
+        for open_set, g_score in ((forward_open, forward_g), (backward_open, backward_g)):
+            while open_set and open_set[0][1] > g_score[open_set[0][2]]:
+                heapq.heappop(open_set)
+        if not forward_open or not backward_open:
+            break
+        if max(forward_open[0][0], backward_open[0][0]) >= best_length:
+            break
+
+        if len(forward_open) <= len(backward_open):
+            open_set, parent, g_score, other_g = forward_open, forward_parent, forward_g, backward_g
+            dist, conflict_tables = forward_dist, forward_tables
+        else:
+            open_set, parent, g_score, other_g = backward_open, backward_parent, backward_g, forward_g
+            dist, conflict_tables = backward_dist, backward_tables
+
+        f_score, current_g, current_state, current_zero = heapq.heappop(open_set)
+        current_h = f_score - current_g
+        tentative_g = current_g + 1
+        for neighbor, neighbor_zero in get_neighbors(current_state, current_zero):
+            if tentative_g >= g_score.get(neighbor, INF):
+                continue
+
+            g_score[neighbor] = tentative_g
+            parent[neighbor] = current_state
+            h_score = update_heuristic(current_h, current_state, current_zero, neighbor, neighbor_zero,
+                                       dist, conflict_tables)
+            heapq.heappush(open_set, (tentative_g + h_score, tentative_g, neighbor, neighbor_zero))
+            if neighbor in other_g and tentative_g + other_g[neighbor] < best_length:
+                best_length = tentative_g + other_g[neighbor]
+                meeting = neighbor
+
+    if meeting is None:
+        return None
+
+    path = reconstruct_path(forward_parent, meeting)
+    current = backward_parent[meeting]
+    while current is not None:
+        path.append(current)
+        current = backward_parent[current]
+    return states_to_boards(path)
+
 def print_board(board: Board) -> None:
-    print("┌─────────┐")
+    lines = ["┌─────────┐"]
     
     for row in board:
-        print("│", end="")
-        for tile in row:
-            if tile == 0:
-                print("   ", end="")
-            else:
-                print(f" {tile} ", end="")
-        print("│")
+        lines.append("│" + "".join("   " if tile == 0 else f" {tile} " for tile in row) + "│")
     
-    print("└─────────┘")
-    print()
+    lines.append("└─────────┘")
+    print("\n".join(lines), end="\n\n")
 
 def main():
 